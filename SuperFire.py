@@ -1,19 +1,51 @@
 import os
+import json
+import time
+import queue
+import socket
 import requests
+import itertools
 import threading
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from PyQt6.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QLabel, QPushButton, QProgressBar, QFileDialog,
-    QLineEdit, QTextEdit, QHBoxLayout, QComboBox, QCheckBox
+    QLineEdit, QPlainTextEdit, QHBoxLayout, QComboBox, QCheckBox, QSpinBox
 )
-from PyQt6.QtCore import Qt, QThread, pyqtSignal
+from PyQt6.QtCore import Qt, QThread, QTimer, pyqtSignal
 
+import urllib3.exceptions
 from urllib3.util.retry import Retry
 from requests.adapters import HTTPAdapter
 
-# Allowed image file extensions
-ALLOWED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp", ".bmp", ".tiff", ".svg"}
+# Allowed image file extensions (lowercase, without the dot)
+ALLOWED_EXTENSIONS = {"jpg", "jpeg", "png", "gif", "webp", "bmp", "tiff", "svg"}
+
+# Streaming copy size: 64 KiB (a multiple of the 4 KiB page size) keeps the
+# read/write loop short without holding large buffers per thread.
+CHUNK_SIZE = 64 * 1024
+
+# Sidecar file (inside the local root) remembering ETag/Last-Modified per file
+CACHE_FILENAME = ".superfire_cache.json"
+
+# O_BINARY keeps Windows from translating newlines in image bytes (0 elsewhere)
+WRITE_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+
+# Minimum spacing between cross-thread progress bar updates
+PROGRESS_INTERVAL_NS = 100_000_000
+
+# The GUI drains worker log lines on a timer instead of per-line signals
+LOG_DRAIN_INTERVAL_MS = 100
+LOG_DRAIN_BATCH = 500
+
+# Downloads are I/O-bound, so default to several threads per core
+DEFAULT_THREADS = min(32, (os.cpu_count() or 4) * 4)
+MAX_THREADS = 64
+
+# Oldest log lines are dropped past this count to keep the widget cheap
+LOG_MAX_LINES = 2000
 
 # ---- User-Agent presets -------------------------------------------------------
 UA_PRESETS = {
@@ -43,40 +75,154 @@ UA_PRESETS = {
     "Custom…": "",  # enables the custom input
 }
 
+# ---- Helpers ------------------------------------------------------------------
+def _file_size(path):
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return None
+
+
+def build_session(pool_size, max_retries=5, backoff=0.5):
+    """Builds a Session configured for resilience, pooling enough sockets for pool_size threads."""
+    session = requests.Session()
+    retry = Retry(
+        total=max_retries,
+        connect=max_retries,
+        read=max_retries,
+        status=max_retries,
+        backoff_factor=backoff,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET", "HEAD", "OPTIONS"],
+        raise_on_status=False
+    )
+    # Headroom over the thread count so redirects/retries don't evict pooled
+    # keep-alive sockets; pool_block caps concurrency instead of opening
+    # throwaway connections.
+    adapter = HTTPAdapter(
+        max_retries=retry,
+        pool_connections=pool_size,
+        pool_maxsize=pool_size * 2,
+        pool_block=True
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def _preallocate(fd, size):
+    """Reserves size bytes up front so the file lands in as few extents as possible."""
+    try:
+        if hasattr(os, "posix_fallocate"):
+            os.posix_fallocate(fd, 0, size)
+        else:
+            os.ftruncate(fd, size)
+    except OSError:
+        pass  # filesystem doesn't support it; the writes still extend the file
+
+
+def _stream_to_file(raw, path, size=0):
+    """Copies a streamed response body to path with unbuffered os.write calls.
+
+    size is the expected body length (0 if unknown) and is used to preallocate.
+    The body is written to "<path>.part" and only replaces path once it is
+    complete, so a failed transfer never leaves a truncated or zero-padded file
+    (or costs the file that was already there). A symlinked path is resolved
+    first so the link stays a link and its target gets the new bytes.
+    """
+    path = os.path.realpath(path)
+    part_path = path + ".part"
+    fd = os.open(part_path, WRITE_FLAGS, 0o644)
+    closed = False
+    try:
+        if size > 0:
+            _preallocate(fd, size)
+        written = 0
+        while True:
+            chunk = raw.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            view = memoryview(chunk)
+            while view:
+                n = os.write(fd, view)
+                view = view[n:]
+                written += n
+        if size > 0 and written != size:
+            os.ftruncate(fd, written)  # drop reserved space the body didn't fill
+        os.close(fd)
+        closed = True
+        # Fails on Windows while a viewer holds the image open
+        os.replace(part_path, path)
+    except BaseException:
+        if not closed:
+            os.close(fd)
+        try:
+            os.remove(part_path)
+        except OSError:
+            pass
+        raise
+
+
+@contextmanager
+def _cached_dns():
+    """Memoizes socket.getaddrinfo for the duration of a run.
+
+    urllib3 resolves the host again for every new pooled connection; with
+    the cache each host costs one lookup per run. Hostnames are kept as-is,
+    so TLS SNI and certificate checks are unaffected.
+    """
+    original = socket.getaddrinfo
+    if getattr(original, "_superfire_cache", False):
+        yield  # an overlapping run already installed it
+        return
+    cache = {}
+
+    def getaddrinfo(*args, **kwargs):
+        key = (args, tuple(sorted(kwargs.items())))
+        try:
+            return cache[key]
+        except KeyError:
+            result = cache[key] = original(*args, **kwargs)
+            return result
+
+    getaddrinfo._superfire_cache = True
+    socket.getaddrinfo = getaddrinfo
+    try:
+        yield
+    finally:
+        if socket.getaddrinfo is getaddrinfo:
+            socket.getaddrinfo = original
+
+
 # ---- Worker -------------------------------------------------------------------
 class DownloadWorker(QThread):
     progress = pyqtSignal(int)
-    log = pyqtSignal(str)
     status_update = pyqtSignal(int, str)  # "red" or "green"
 
-    def __init__(self, local_root, remote_root, num_threads=5, headers=None, timeout=20, max_retries=5, backoff=0.5):
+    def __init__(self, local_root, remote_root, num_threads=5, headers=None, timeout=20, max_retries=5, backoff=0.5,
+                 session=None):
         super().__init__()
         self.local_root = local_root
         self.remote_root = remote_root.rstrip("/")
         self.num_threads = num_threads
         self.total_files = 0
-        self.downloaded_files = 0
+        # next() on itertools.count is atomic under the GIL, so finishing threads
+        # don't need to serialize on a lock just to bump the tally
+        self._counter = itertools.count(1)
         self.lock = threading.Lock()
         self.timeout = timeout
         self.headers = headers or {}
         self.max_retries = max_retries
         self.backoff = backoff
+        self.cache_path = os.path.join(self.local_root, CACHE_FILENAME)
+        self.cache = {}
+        self._last_pct = -1
+        self._last_progress_ns = 0
+        # Log lines for the GUI to drain; put() is cheap and never touches Qt
+        self.log_q = queue.SimpleQueue()
 
-        # Build a fresh Session configured for resilience
-        self.session = requests.Session()
-        retry = Retry(
-            total=self.max_retries,
-            connect=self.max_retries,
-            read=self.max_retries,
-            status=self.max_retries,
-            backoff_factor=self.backoff,
-            status_forcelist=[429, 500, 502, 503, 504],
-            allowed_methods=["GET", "HEAD", "OPTIONS"],
-            raise_on_status=False
-        )
-        adapter = HTTPAdapter(max_retries=retry, pool_maxsize=self.num_threads)
-        self.session.mount("https://", adapter)
-        self.session.mount("http://", adapter)
+        # Reuse the caller's Session (and its warm sockets) when given one
+        self.session = session or build_session(self.num_threads, self.max_retries, self.backoff)
 
         # If user wanted identity (no compression)
         if self.headers.get("_identity_encoding"):
@@ -99,41 +245,171 @@ class DownloadWorker(QThread):
         self.total_files = len(files_to_download)
 
         if self.total_files == 0:
-            self.log.emit("No image files found to download.")
+            self._queue_log("No image files found to download.")
             self.progress.emit(100)
             return
 
-        with ThreadPoolExecutor(max_workers=self.num_threads) as executor:
-            futures = {
-                executor.submit(self.download_file, file_info, i % self.num_threads): i
-                for i, file_info in enumerate(files_to_download)
-            }
-            for future in as_completed(futures):
+        self.cache = self._load_cache()
+        try:
+            with _cached_dns():
+                # Resolves the host once; every later connection hits the cache
+                self._preconnect()
+                with ThreadPoolExecutor(max_workers=self.num_threads) as executor:
+                    futures = {
+                        executor.submit(self.download_file, file_info, i % self.num_threads): i
+                        for i, file_info in enumerate(files_to_download)
+                    }
+                    for future in as_completed(futures):
+                        try:
+                            future.result()
+                        except Exception as e:
+                            self._queue_log(f"⚠️ Unhandled worker error: {e}")
+        finally:
+            self._save_cache()
+            # All workers are done; drawing once more yields the final tally
+            self._report_progress(next(self._counter) - 1, force=True)
+
+    def _preconnect(self):
+        """Opens (and pools) the first connection before the threads race to create their own.
+
+        The HEAD goes straight to the shared adapter's pool with retries off, so
+        an unreachable host costs one 5 s attempt here instead of the adapter's
+        whole retry/backoff schedule on top of the per-file ones.
+        """
+        headers = {k: v for k, v in self.headers.items() if not k.startswith("_")}
+        try:
+            prep = self.session.prepare_request(requests.Request("HEAD", self.remote_root, headers=headers))
+            settings = self.session.merge_environment_settings(prep.url, {}, None, None, None)
+            if requests.utils.select_proxy(prep.url, settings["proxies"]):
+                return  # proxied connections are pooled per proxy; nothing to warm here
+            adapter = self.session.get_adapter(prep.url)
+            if hasattr(adapter, "get_connection_with_tls_context"):  # requests >= 2.32.2
+                conn = adapter.get_connection_with_tls_context(prep, settings["verify"], cert=settings["cert"])
+            else:
+                conn = adapter.get_connection(prep.url)
+            adapter.cert_verify(conn, prep.url, settings["verify"], settings["cert"])
+            conn.urlopen(
+                "HEAD", prep.path_url, headers=prep.headers,
+                retries=False, redirect=False, timeout=5
+            )
+        except (requests.exceptions.RequestException, urllib3.exceptions.HTTPError, ValueError, OSError) as e:
+            self._queue_log(f"⚠️ Could not reach {self.remote_root}: {e}")
+
+    def _load_cache(self):
+        """Reads the validator cache; a missing or corrupt file means a cold run."""
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def _save_cache(self):
+        tmp_path = self.cache_path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.cache, f)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            self._queue_log(f"⚠️ Could not save cache {self.cache_path}: {e}")
+
+    def _queue_log(self, message):
+        self.log_q.put(message)
+
+    def _report_progress(self, done, force=False):
+        """Emits progress only when it changed and not more than every 100 ms.
+
+        Lock-free: a racing thread may emit a stale value late, which the UI
+        absorbs by never moving the bar backwards.
+        """
+        pct = done * 100 // self.total_files
+        if pct == self._last_pct:
+            return
+        now = time.monotonic_ns()
+        if force or done == self.total_files or now - self._last_progress_ns >= PROGRESS_INTERVAL_NS:
+            self._last_pct = pct
+            self._last_progress_ns = now
+            self.progress.emit(pct)
+
+    def _mark_done(self, message):
+        self._report_progress(next(self._counter))
+        self._queue_log(message)
+
+    def _should_skip(self, local_path, remote_url, headers):
+        """HEAD preflight for files with no cached validators.
+
+        True when the local file already has the remote Content-Length and
+        isn't older than its Last-Modified; the validators are then cached so
+        the next run can use a conditional GET instead.
+        """
+        local_size = _file_size(local_path)
+        if not local_size:
+            return False
+
+        try:
+            with self.session.head(remote_url, headers=headers, timeout=self.timeout, allow_redirects=True) as h:
+                status, remote_headers = h.status_code, h.headers
+        except requests.exceptions.RequestException:
+            return False
+        # An encoded length says nothing about the decoded file on disk
+        if status != 200 or remote_headers.get("Content-Encoding", "identity") != "identity":
+            return False
+        try:
+            if int(remote_headers.get("Content-Length", -1)) != local_size:
+                return False
+        except ValueError:
+            return False
+
+        last_modified = remote_headers.get("Last-Modified")
+        if last_modified:
+            try:
+                remote_mtime = parsedate_to_datetime(last_modified).timestamp()
+            except (TypeError, ValueError):
+                remote_mtime = None
+            if remote_mtime:
                 try:
-                    future.result()
-                except Exception as e:
-                    self.log.emit(f"⚠️ Unhandled worker error: {e}")
+                    if os.path.getmtime(local_path) < remote_mtime:
+                        return False
+                except OSError:
+                    return False  # removed mid-run; let the GET recreate it
+
+        etag = remote_headers.get("ETag")
+        if etag or last_modified:
+            with self.lock:
+                self.cache[local_path] = {
+                    "url": remote_url,
+                    "etag": etag,
+                    "last_modified": last_modified,
+                    "size": local_size,
+                }
+        return True
 
     def get_files_to_download(self):
         """Scans local directory and maps to remote image URLs preserving structure."""
         file_list = []
-        for root, _, files in os.walk(self.local_root):
-            for file in files:
-                ext = os.path.splitext(file)[1].lower()
-                if ext in ALLOWED_EXTENSIONS:
-                    local_path = os.path.join(root, file)
-                    relative_path = os.path.relpath(local_path, self.local_root).replace("\\", "/")
-                    remote_url = f"{self.remote_root}/{relative_path}"
-                    file_list.append((local_path, remote_url))
+        stack = [self.local_root]
+        # Entry paths are "<root><sep><relative>", so slicing beats os.path.relpath
+        root_len = len(os.path.join(self.local_root, ""))
+        while stack:
+            try:
+                it = os.scandir(stack.pop())
+            except OSError:
+                continue  # unreadable folder; os.walk skipped these too
+            with it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file():
+                        _, dot, ext = entry.name.rpartition(".")
+                        if dot and ext.lower() in ALLOWED_EXTENSIONS:
+                            relative_path = entry.path[root_len:].replace("\\", "/")
+                            file_list.append((entry.path, f"{self.remote_root}/{relative_path}"))
         return file_list
 
     def download_file(self, file_info, thread_id):
         local_path, remote_url = file_info
         self.status_update.emit(thread_id, "red")
 
-        # Ensure local folder exists
-        os.makedirs(os.path.dirname(local_path), exist_ok=True)
-
         try:
             # Build per-request headers (optionally add Referer per URL path)
             req_headers = dict(self.headers)
@@ -150,30 +426,63 @@ class DownloadWorker(QThread):
                     pass
                 del req_headers["_dynamic_referer"]
 
-            r = self.session.get(
+            # Conditional GET: only trust the validators if they came from this
+            # same URL (the remote root can change between runs) and the file on
+            # disk is still the one we wrote last time.
+            entry = self.cache.get(local_path)
+            if entry and entry.get("url") == remote_url and _file_size(local_path) == entry.get("size"):
+                if entry.get("etag"):
+                    req_headers["If-None-Match"] = entry["etag"]
+                if entry.get("last_modified"):
+                    req_headers["If-Modified-Since"] = entry["last_modified"]
+            elif self._should_skip(local_path, remote_url, req_headers):
+                self._mark_done(f"⏭️ Up to date: {local_path}")
+                return
+
+            # Context-managed so the pooled keep-alive connection is handed back
+            # even when the body is never read (404s etc.), instead of forcing
+            # the next request onto a fresh TCP/TLS handshake.
+            with self.session.get(
                 remote_url,
                 headers=req_headers,
                 timeout=self.timeout,
                 allow_redirects=True,
                 stream=True
-            )
-
-            if r.status_code == 200:
-                with open(local_path, "wb") as f:
-                    for chunk in r.iter_content(chunk_size=1024 * 16):
-                        if chunk:
-                            f.write(chunk)
-
-                with self.lock:
-                    self.downloaded_files += 1
-                    pct = int((self.downloaded_files / self.total_files) * 100)
-                    self.progress.emit(pct)
-                    self.log.emit(f"✅ Downloaded: {local_path}")
-            else:
-                self.log.emit(f"❌ Failed: {remote_url} (HTTP {r.status_code})")
-
-        except requests.exceptions.RequestException as e:
-            self.log.emit(f"⚠️ Error downloading {remote_url}: {e}")
+            ) as r:
+                if r.status_code == 304:
+                    self._mark_done(f"⏭️ Unchanged: {local_path}")
+                elif r.status_code == 200:
+                    # Let urllib3 undo gzip/deflate so decoded bytes hit disk
+                    r.raw.decode_content = True
+                    # Content-Length is only the on-disk size for unencoded bodies
+                    size = 0
+                    if r.headers.get("Content-Encoding", "identity") == "identity":
+                        try:
+                            size = int(r.headers.get("Content-Length", 0))
+                        except ValueError:
+                            pass
+                    _stream_to_file(r.raw, local_path, size)
+
+                    etag = r.headers.get("ETag")
+                    last_modified = r.headers.get("Last-Modified")
+                    with self.lock:
+                        if etag or last_modified:
+                            self.cache[local_path] = {
+                                "url": remote_url,
+                                "etag": etag,
+                                "last_modified": last_modified,
+                                "size": _file_size(local_path),
+                            }
+                        else:
+                            self.cache.pop(local_path, None)
+                    self._mark_done(f"✅ Downloaded: {local_path}")
+                else:
+                    self._queue_log(f"❌ Failed: {remote_url} (HTTP {r.status_code})")
+
+        # r.raw is read directly, so mid-body urllib3 errors (reset, read timeout,
+        # decode failure) arrive unwrapped; OSError covers the local file writes
+        except (requests.exceptions.RequestException, urllib3.exceptions.HTTPError, OSError) as e:
+            self._queue_log(f"⚠️ Error downloading {remote_url}: {e}")
         finally:
             with self.lock:
                 self.status_update.emit(thread_id, "green")
@@ -186,6 +495,13 @@ class ImageDownloaderApp(QWidget):
         self.setWindowTitle("SuperFire Template Image Downloader")
         self.setGeometry(200, 200, 950, 560)
         self.init_ui()
+        # Shared across runs so pooled connections survive between clicks;
+        # rebuilt only when the thread count (and so the pool size) changes
+        self._session_pool_size = self.thread_spin.value()
+        self._session = build_session(self._session_pool_size, max_retries=5, backoff=0.6)
+        self.worker = None
+        self._log_timer = QTimer(self)
+        self._log_timer.timeout.connect(self._drain_logs)
 
     def init_ui(self):
         layout = QVBoxLayout()
@@ -229,9 +545,17 @@ class ImageDownloaderApp(QWidget):
         knobs_row = QHBoxLayout()
         self.cb_identity = QCheckBox("Disable compression (Accept-Encoding: identity)")
         self.cb_conn_close = QCheckBox("Connection: close")
+        self.cb_conn_close.setToolTip("Disables connection reuse: every file pays a new TCP/TLS handshake.")
         knobs_row.addWidget(self.cb_identity)
         knobs_row.addWidget(self.cb_conn_close)
         knobs_row.addStretch()
+        self.thread_spin_label = QLabel("Concurrent downloads:")
+        self.thread_spin = QSpinBox()
+        self.thread_spin.setRange(1, MAX_THREADS)
+        self.thread_spin.setValue(DEFAULT_THREADS)
+        self.thread_spin.valueChanged.connect(self._resize_thread_lights)
+        knobs_row.addWidget(self.thread_spin_label)
+        knobs_row.addWidget(self.thread_spin)
 
         # Start
         self.start_button = QPushButton("Start Download")
@@ -242,16 +566,14 @@ class ImageDownloaderApp(QWidget):
         self.progress_bar.setTextVisible(True)
 
         # Thread indicator lights
-        self.thread_labels = [QLabel("🟢") for _ in range(5)]
+        self.thread_labels = []
         self.thread_layout = QHBoxLayout()
-        for lbl in self.thread_labels:
-            lbl.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            lbl.setStyleSheet("font-size: 15px;")
-            self.thread_layout.addWidget(lbl)
+        self._resize_thread_lights(self.thread_spin.value())
 
         # Log
-        self.log_output = QTextEdit()
+        self.log_output = QPlainTextEdit()
         self.log_output.setReadOnly(True)
+        self.log_output.setMaximumBlockCount(LOG_MAX_LINES)
 
         # Assemble
         layout.addWidget(self.local_label)
@@ -268,6 +590,18 @@ class ImageDownloaderApp(QWidget):
         layout.addWidget(self.log_output)
         self.setLayout(layout)
 
+    def _resize_thread_lights(self, count):
+        while len(self.thread_labels) < count:
+            lbl = QLabel("🟢")
+            lbl.setAlignment(Qt.AlignmentFlag.AlignCenter)
+            lbl.setStyleSheet("font-size: 15px;")
+            self.thread_layout.addWidget(lbl)
+            self.thread_labels.append(lbl)
+        while len(self.thread_labels) > count:
+            lbl = self.thread_labels.pop()
+            self.thread_layout.removeWidget(lbl)
+            lbl.deleteLater()
+
     def _toggle_custom_ua(self):
         self.ua_custom.setEnabled(self.ua_combo.currentText() == "Custom…")
 
@@ -281,7 +615,7 @@ class ImageDownloaderApp(QWidget):
         remote_root = self.remote_input.text().strip()
 
         if not local_root or not remote_root:
-            self.log_output.append("⚠️ Please enter both the local root path and remote URL.")
+            self.log_output.appendPlainText("⚠️ Please enter both the local root path and remote URL.")
             return
 
         # Build headers from UI selections
@@ -305,31 +639,70 @@ class ImageDownloaderApp(QWidget):
 
         self.progress_bar.setValue(0)
         self.log_output.clear()
+        if self.cb_conn_close.isChecked():
+            self.log_output.appendPlainText("⚠️ Connection: close disables connection pooling; downloads will be slower.")
 
         # Reset thread lights
         for lbl in self.thread_labels:
             lbl.setText("🟢")
 
+        num_threads = self.thread_spin.value()
+        if num_threads != self._session_pool_size:
+            self._retire_session(self._session)
+            self._session_pool_size = num_threads
+            self._session = build_session(num_threads, max_retries=5, backoff=0.6)
+
         # Spin up worker
         self.worker = DownloadWorker(
             local_root=local_root,
             remote_root=remote_root,
-            num_threads=len(self.thread_labels),
+            num_threads=num_threads,
             headers=headers,
             timeout=25,
-            max_retries=5,
-            backoff=0.6
+            session=self._session
         )
         self.worker.progress.connect(self.update_progress)
-        self.worker.log.connect(self.update_log)
         self.worker.status_update.connect(self.update_thread_lights)
+        self.worker.finished.connect(self._on_worker_finished)
         self.worker.start()
+        self._log_timer.start(LOG_DRAIN_INTERVAL_MS)
+
+    def _retire_session(self, session):
+        """Closes a replaced Session now, or once the worker still using it finishes."""
+        worker = self.worker
+        if worker is not None and worker.session is session and not worker.isFinished():
+            worker.finished.connect(session.close)
+            if not worker.isFinished():
+                return
+            # finished between the check and the connect; the signal may be missed
+        session.close()
 
     def update_progress(self, value):
-        self.progress_bar.setValue(value)
+        self.progress_bar.setValue(max(value, self.progress_bar.value()))
 
     def update_log(self, message):
-        self.log_output.append(message)
+        self.log_output.appendPlainText(message)
+
+    def _drain_logs(self, limit=LOG_DRAIN_BATCH):
+        """Moves up to limit queued worker lines into the log in a single append."""
+        if self.worker is None:
+            return 0
+        lines = []
+        try:
+            while len(lines) < limit:
+                lines.append(self.worker.log_q.get_nowait())
+        except queue.Empty:
+            pass
+        if lines:
+            self.update_log("\n".join(lines))
+        return len(lines)
+
+    def _on_worker_finished(self):
+        if self.sender() is not self.worker:
+            return  # a superseded run; the current one still owns the timer
+        self._log_timer.stop()
+        while self._drain_logs():
+            pass
 
     def update_thread_lights(self, thread_id, status):
         if 0 <= thread_id < len(self.thread_labels):